@@ -1,6 +1,8 @@
 import os
+import re
 import autogen
 from autogen.agentchat.contrib.agent_builder import AgentBuilder
+from autogen.code_utils import content_str
 from finrobot.utils import get_current_date
 
 
@@ -34,11 +36,52 @@ else:
     )
     builder.save(config_path)
 
-group_chat = autogen.GroupChat(agents=agent_list, messages=[], max_round=20)
+
+def forecaster_router(last_speaker, groupchat):
+    """
+    Pick the next speaker by rule rather than by an extra LLM call each round:
+    code goes to the terminal, the terminal reports back to the expert who wrote it,
+    and otherwise the experts take turns.
+    """
+    terminal = next(
+        (a for a in groupchat.agents if isinstance(a, autogen.UserProxyAgent)), None
+    )
+    experts = [a for a in groupchat.agents if a is not terminal]
+    messages = groupchat.messages
+    if terminal is not None and last_speaker is terminal:
+        # hand the execution result back to the author of the code
+        author = messages[-2]["name"] if len(messages) > 1 else experts[0].name
+        return groupchat.agent_by_name(author) or experts[0]
+    if terminal is not None and "```" in content_str(messages[-1].get("content")):
+        return terminal
+    if last_speaker not in experts:
+        return experts[0]
+    return experts[(experts.index(last_speaker) + 1) % len(experts)]
+
+
+group_chat = autogen.GroupChat(
+    agents=agent_list,
+    messages=[],
+    max_round=20,
+    speaker_selection_method=forecaster_router,
+)
+
+# Stop as soon as the final forecast is given instead of running out all rounds
+final_forecast = re.compile(r"^\s*FINAL FORECAST:", re.MULTILINE)
+
+
+def is_final_forecast(message):
+    content = content_str(message.get("content"))
+    return "TERMINATE" in content or bool(final_forecast.search(content))
+
+
 manager = autogen.GroupChatManager(
-    groupchat=group_chat, llm_config={"config_list": config_list, **llm_config}
+    groupchat=group_chat,
+    llm_config={"config_list": config_list, **llm_config},
+    is_termination_msg=is_final_forecast,
 )
 agent_list[0].initiate_chat(
     manager,
-    message=f"Today is {get_current_date()}, predict next week's stock price for Nvidia with its recent market news and stock price movements.",
+    message=f"Today is {get_current_date()}, predict next week's stock price for Nvidia with its recent market news and stock price movements. "
+    "Once the prediction is settled, give it on a last line starting with 'FINAL FORECAST:' (e.g. FINAL FORECAST: up by 2-3%).",
 )
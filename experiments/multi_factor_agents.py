@@ -1,11 +1,13 @@
-import re
 import json
 import autogen
 from autogen.cache import Cache
+from autogen.agentchat.chat import initiate_chats
+from finrobot.agents.utils import contains_terminate, order_tags, _order_pattern
 
 # from finrobot.utils import create_inner_assistant
 
-from functools import partial
+from functools import partial, lru_cache
+from pathlib import Path
 
 
 config_list_gpt4 = autogen.config_list_from_json(
@@ -15,13 +17,18 @@ config_list_gpt4 = autogen.config_list_from_json(
     },
 )
 
+# Built once and shared by reference with every agent of the group
 llm_config = {
     "config_list": config_list_gpt4,
     "cache_seed": 42,
     "temperature": 0,
 }
 
-quant_group_config = json.load(open("quantitative_investment_group_config.json"))
+
+@lru_cache(maxsize=1)
+def load_quant_group_config(path="quantitative_investment_group_config.json"):
+    return json.loads(Path(path).read_bytes())
+
 
 # user_proxy = autogen.UserProxyAgent(
 #     name="User",
@@ -30,62 +37,14 @@ quant_group_config = json.load(open("quantitative_investment_group_config.json")
 #     code_execution_config=False
 # )
 
-group_descs = "\n\n".join(
-    [
-        "Name: {} \nResponsibility: {}".format(c["name"], c["profile"])
-        for c in quant_group_config
-    ]
-)
 
-group_leader = autogen.AssistantAgent(
-    name="Group_Leader",
-    system_message="""
-    As a group leader, you are responsible for coordinating the team's efforts to achieve the project's objectives. 
-    You must ensure that the team is working together effectively and efficiently. 
-    Summarize the status of the whole project progess every time you respond, and assign task to one of the group members to progress the project. 
-    Orders should follow the format: \"[<name of staff>] <order>\" and appear at the end of your response.
-    After receiving feedback from the team members, check the progress of the task, and make sure the task is well completed before proceding to th next order.
-    If the task is not well completed, your order should be to provide assistance and guidance for the team members to complete it again.
-    Reply TERMINATE only when the whole project is done. Your team members are as follows:\n\n
-    """
-    + group_descs,
-    llm_config=llm_config,
-)
+def order_trigger(order_tag, sender):
+    return bool(order_tag.search(sender.last_message()["content"] or ""))
 
-executor = autogen.UserProxyAgent(
-    name="Executor",
-    human_input_mode="NEVER",
-    # human_input_mode="ALWAYS",
-    is_termination_msg=lambda x: x.get("content", "")
-    and "TERMINATE" in x.get("content", ""),
-    # max_consecutive_auto_reply=3,
-    code_execution_config={
-        "last_n_messages": 3,
-        "work_dir": "quant",
-        "use_docker": False,
-    },
-)
 
-quant_group = {
-    c["name"]: autogen.agentchat.AssistantAgent(
-        name=c["name"],
-        system_message=c["profile"],
-        llm_config=llm_config,
-    )
-    for c in quant_group_config
-}
-
-
-def order_trigger(pattern, sender):
-    # print(pattern)
-    # print(sender.last_message()['content'])
-    return pattern in sender.last_message()["content"]
-
-
-def order_message(pattern, recipient, messages, sender, config):
+def order_message(name, recipient, messages, sender, config):
     full_order = recipient.chat_messages_for_summary(sender)[-1]["content"]
-    pattern = rf"\[{pattern}\](?::)?\s*(.+?)(?=\n\[|$)"
-    match = re.search(pattern, full_order, re.DOTALL)
+    match = _order_pattern(name).search(full_order)
     if match:
         order = match.group(1).strip()
     else:
@@ -95,27 +54,104 @@ def order_message(pattern, recipient, messages, sender, config):
     For coding tasks, provide python scripts and executor will run it for you.
     Save your results or any intermediate data locally and let group leader know how to read them.
     DO NOT include TERMINATE in your response until you have received the results from the execution of the Python scripts.
-    If the task cannot be done currently or need assistance from other members, report the reasons or requirements to group leader ended with TERMINATE. 
+    If the task cannot be done currently or need assistance from other members, report the reasons or requirements to group leader ended with TERMINATE.
     """
     # For coding tasks, only use the functions you have been provided with.
 
 
-for name, agent in quant_group.items():
-    executor.register_nested_chats(
+class LazyAgents(dict):
+    """Group members keyed on name, each agent is only created on its first order."""
+
+    def __init__(self, configs):
+        super().__init__()
+        self.configs = {c["name"]: c for c in configs}
+
+    def __missing__(self, name):
+        agent = self[name] = autogen.agentchat.AssistantAgent(
+            name=name,
+            system_message=self.configs[name]["profile"],
+            llm_config=llm_config,
+        )
+        return agent
+
+
+def summary_from_order(members, chat_queue, recipient, messages, sender, config):
+    # Resolve the ordered member, so it is only built once it gets an order
+    chat = chat_queue[0]
+    order = chat["message"](recipient, messages, sender, config)
+    nested_chat = dict(chat, recipient=members[chat["recipient"]], message=order)
+    return True, initiate_chats([nested_chat])[-1].summary
+
+
+def build_quant_group():
+    """Build the group leader and the executor with one nested chat per group member."""
+
+    quant_group_config = load_quant_group_config()
+
+    group_descs = "\n\n".join(
         [
-            {
-                "sender": executor,
-                "recipient": agent,
-                "message": partial(order_message, name),
-                "summary_method": "reflection_with_llm",
-                "max_turns": 10,
-                "max_consecutive_auto_reply": 3,
-            }
-        ],
-        trigger=partial(order_trigger, f"[{name}]"),
+            "Name: {} \nResponsibility: {}".format(c["name"], c["profile"])
+            for c in quant_group_config
+        ]
+    )
+
+    group_leader = autogen.AssistantAgent(
+        name="Group_Leader",
+        system_message="""
+    As a group leader, you are responsible for coordinating the team's efforts to achieve the project's objectives.
+    You must ensure that the team is working together effectively and efficiently.
+    Summarize the status of the whole project progess every time you respond, and assign task to one of the group members to progress the project.
+    Orders should follow the format: \"[<name of staff>] <order>\" and appear at the end of your response.
+    After receiving feedback from the team members, check the progress of the task, and make sure the task is well completed before proceding to th next order.
+    If the task is not well completed, your order should be to provide assistance and guidance for the team members to complete it again.
+    Reply TERMINATE only when the whole project is done. Your team members are as follows:\n\n
+    """
+        + group_descs,
+        llm_config=llm_config,
+    )
+
+    executor = autogen.UserProxyAgent(
+        name="Executor",
+        human_input_mode="NEVER",
+        # human_input_mode="ALWAYS",
+        is_termination_msg=contains_terminate,
+        # max_consecutive_auto_reply=3,
+        code_execution_config={
+            "last_n_messages": 3,
+            "work_dir": "quant",
+            "use_docker": False,
+        },
     )
 
+    # Members are only built once the leader orders them
+    quant_group = LazyAgents(quant_group_config)
+
+    for name in quant_group.configs:
+        executor.register_nested_chats(
+            [
+                {
+                    "sender": executor,
+                    "recipient": name,  # resolved to the agent when the order is run
+                    "message": partial(order_message, name),
+                    "summary_method": "reflection_with_llm",
+                    "max_turns": 10,
+                    "max_consecutive_auto_reply": 3,
+                }
+            ],
+            # same order rules as the leader groups of finrobot.agents
+            trigger=partial(order_trigger, order_tags([name])),
+            reply_func_from_nested_chats=partial(summary_from_order, quant_group),
+        )
+
+    return group_leader, executor
+
+
 quant_task = "Develop and test the feasibility of a quantitative investment strategy focusing on the Dow Jones 30 stocks, utilizing your multi-factor analysis expertise to identify potential investment opportunities and optimize the portfolio's performance. Ensure the strategy is robust, data-driven, and aligns with our risk management principles."
 
-with Cache.disk() as cache:
-    executor.initiate_chat(group_leader, message=quant_task, cache=cache)
+
+if __name__ == "__main__":
+
+    group_leader, executor = build_quant_group()
+
+    with Cache.disk() as cache:
+        executor.initiate_chat(group_leader, message=quant_task, cache=cache)
@@ -1,90 +1,115 @@
+import asyncio
 import autogen
+from autogen.cache import Cache
 from finrobot.agents.workflow import MultiAssistant, MultiAssistantWithLeader
+from finrobot.agents.utils import NormalizedCache, contains_terminate
 from finrobot.functional import get_rag_function
-from finrobot.utils import register_keys_from_json
+from finrobot.utils import register_keys_from_json, get_config_list
 from textwrap import dedent
+from concurrent.futures import ThreadPoolExecutor
 from autogen import register_function
 from investment_group import group_config
 
 
-llm_config = {
-    "config_list": autogen.config_list_from_json(
-        "../OAI_CONFIG_LIST",
-        filter_dict={
-            "model": ["gpt-4-0125-preview"],
-        },
-    ),
-    "cache_seed": 42,
-    "temperature": 0,
-}
-
-register_keys_from_json("../config_api_keys")
-
-# group_config = json.load(open("investment_group.json"))
-
-user_proxy = autogen.UserProxyAgent(
-    name="User",
-    # human_input_mode="ALWAYS",
-    human_input_mode="NEVER",
-    is_termination_msg=lambda x: x.get("content", "")
-    and "TERMINATE" in x.get("content", ""),
-    code_execution_config={
-        "last_n_messages": 3,
-        "work_dir": "quant",
-        "use_docker": False,
-    },
-)
-
-rag_func = get_rag_function(
-    retrieve_config={
-        "task": "qa",
-        "docs_path": "https://www.sec.gov/Archives/edgar/data/1737806/000110465923049927/pdd-20221231x20f.htm",
-        "chunk_token_size": 1000,
-        "collection_name": "pdd2022",
-        "get_or_create": True,
-    },
-)
-
-with_leader_config = {
-    "Market Sentiment Analysts": True,
-    "Risk Assessment Analysts": True,
-    "Fundamental Analysts": True,
-}
+def build_pipeline() -> MultiAssistantWithLeader:
+    """Register the API keys and build the CIO group on top of the analyst groups."""
 
-representatives = []
+    llm_config = {
+        "config_list": get_config_list("../OAI_CONFIG_LIST", ["gpt-4-0125-preview"]),
+        "cache_seed": 42,
+        "temperature": 0,
+    }
 
-for group_name, single_group_config in group_config["groups"].items():
+    register_keys_from_json("../config_api_keys")
 
-    with_leader = with_leader_config.get(group_name)
-    if with_leader:
-        group_members = single_group_config["with_leader"]
-        group_members["agents"] = group_members.pop("employees")
-        group = MultiAssistantWithLeader(
-            group_members, llm_config=llm_config, user_proxy=user_proxy
-        )
-    else:
-        group_members = single_group_config["without_leader"]
-        group_members["agents"] = group_members.pop("employees")
-        group = MultiAssistant(
-            group_members, llm_config=llm_config, user_proxy=user_proxy
-        )
+    # group_config = json.load(open("investment_group.json"))
 
-    for agent in group.agents:
-        register_function(
-            rag_func,
-            caller=agent,
-            executor=group.user_proxy,
-            description="retrieve content from PDD's 2022 20-F Sec Filing for QA",
+    user_proxy = autogen.UserProxyAgent(
+        name="User",
+        # human_input_mode="ALWAYS",
+        human_input_mode="NEVER",
+        is_termination_msg=contains_terminate,
+        code_execution_config={
+            "last_n_messages": 3,
+            "work_dir": "quant",
+            "use_docker": False,
+        },
+    )
+
+    # Create the retrieval agent (vector db client and embedding model) in the background
+    # while the groups are built
+    # (the executor is shut down on the way out, also when building a group fails)
+    with ThreadPoolExecutor(max_workers=1) as rag_executor:
+        rag_future = rag_executor.submit(
+            get_rag_function,
+            retrieve_config={
+                "task": "qa",
+                "docs_path": "https://www.sec.gov/Archives/edgar/data/1737806/000110465923049927/pdd-20221231x20f.htm",
+                "chunk_token_size": 1000,
+                "collection_name": "pdd2022",
+                "get_or_create": True,
+                # the filing does not change, reuse the persisted collection without re-chunking it
+                "new_docs": False,
+            },
+            # retrievals of the concurrently running groups don't block the event loop
+            use_async=True,
         )
 
-    representatives.append(group.representative)
-
+        with_leader_config = {
+            "Market Sentiment Analysts": True,
+            "Risk Assessment Analysts": True,
+            "Fundamental Analysts": True,
+        }
+
+        groups = []
+
+        for group_name, single_group_config in group_config["groups"].items():
+
+            with_leader = with_leader_config.get(group_name)
+            # copy the group config, so the shared group_config is left untouched
+            if with_leader:
+                group_members = dict(single_group_config["with_leader"])
+                group_members["agents"] = group_members.pop("employees")
+                # members work independently, run their orders concurrently
+                group_members["use_async"] = True
+                group = MultiAssistantWithLeader(
+                    group_members, llm_config=llm_config, user_proxy=user_proxy
+                )
+            else:
+                group_members = dict(single_group_config["without_leader"])
+                group_members["agents"] = group_members.pop("employees")
+                group = MultiAssistant(
+                    group_members, llm_config=llm_config, user_proxy=user_proxy
+                )
+
+            groups.append(group)
+
+        rag_func, _ = rag_future.result()
+
+    representatives = []
+
+    for group in groups:
+
+        for agent in group.agents:
+            register_function(
+                rag_func,
+                caller=agent,
+                executor=group.user_proxy,
+                description="retrieve content from PDD's 2022 20-F Sec Filing for QA",
+            )
+
+        representatives.append(group.representative)
+
+    cio_config = group_config["CIO"]
+    main_group_config = {
+        "leader": cio_config,
+        "agents": representatives,
+        "use_async": True,
+    }
+    return MultiAssistantWithLeader(
+        main_group_config, llm_config=llm_config, user_proxy=user_proxy
+    )
 
-cio_config = group_config["CIO"]
-main_group_config = {"leader": cio_config, "agents": representatives}
-main_group = MultiAssistantWithLeader(
-    main_group_config, llm_config=llm_config, user_proxy=user_proxy
-)
 
 task = dedent(
     """
@@ -166,4 +191,14 @@ task = dedent(
 # """
 # )
 
-main_group.chat(message=task, use_cache=True)
+if __name__ == "__main__":
+
+    main_group = build_pipeline()
+
+    # Same seed as llm_config, so leader-based and leaderless runs share one cache.
+    # achat hands this cache to the nested chat of every order, from the CIO to the analyst
+    # groups and from their leaders to the members, in every round. Prompts differing only
+    # in trailing whitespace share their entries.
+    # The analyst groups work independently, so their orders run concurrently.
+    with NormalizedCache(Cache.disk(cache_seed=42)) as cache:
+        asyncio.run(main_group.achat(message=task, cache=cache))
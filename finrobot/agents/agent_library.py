@@ -1,6 +1,7 @@
 from finrobot.data_source import *
 from finrobot.functional import *
 from textwrap import dedent
+from types import MappingProxyType
 
 library = [
     {
@@ -38,12 +39,21 @@ library = [
     {
         "name": "Market_Analyst",
         "profile": "As a Market Analyst, one must possess strong analytical and problem-solving abilities, collect necessary financial information and aggregate them based on client's requirement. For coding tasks, only use the functions you have been provided with. Reply TERMINATE when the task is done.",
-        "toolkits": [
+        "toolkits": (
             FinnHubUtils.get_company_profile,
             FinnHubUtils.get_company_news,
             FinnHubUtils.get_basic_financials,
             YFinanceUtils.get_stock_data,
-        ],
+        ),
+    },
+    {
+        # Market_Analyst with the data fetched concurrently, in fewer tool calls
+        "name": "Market_Analyst_Batch",
+        "profile": "As a Market Analyst, one must possess strong analytical and problem-solving abilities, collect necessary financial information and aggregate them based on client's requirement. Call gather_company_data only once per company, as it returns the profile, news, basic financials and stock prices together. When stock prices of several companies are needed, retrieve them together with get_stock_data_batch. For coding tasks, only use the functions you have been provided with. Reply TERMINATE when the task is done.",
+        "toolkits": (
+            MarketDataUtils.gather_company_data,  # Profile, news, basic financials and stock price in one call
+            MarketDataUtils.get_stock_data_batch,  # Close prices of several tickers in one request
+        ),
     },
     {
         "name": "Expert_Investor",
@@ -68,14 +78,15 @@ library = [
             Reply TERMINATE when everything is settled.
             """
         ),
-        "toolkits": [
+        "toolkits": (
             FMPUtils.get_sec_report,  # Retrieve SEC report url and filing date
             IPythonUtils.display_image,  # Display image in IPython
             TextUtils.check_text_length,  # Check text length
             ReportLabUtils.build_annual_report,  # Build annual report in designed pdf format
             ReportAnalysisUtils,  # Expert Knowledge for Report Analysis
             ReportChartUtils,  # Expert Knowledge for Report Chart Plotting
-        ],
+        ),
     },
 ]
-library = {d["name"]: d for d in library}
+# Read-only, so the library can be shared by every agent built from it
+library = MappingProxyType({d["name"]: d for d in library})
@@ -13,7 +13,7 @@ leader_system_message = dedent(
     - End your response with an order to one of your team members to progress the project, if the objective has not been achieved yet.
     - Orders should be follow the format: \"[<name of staff>] <order>\".
     - Orders need to be detailed, including necessary time period information, stock information or instruction from higher level leaders. 
-    - Make only one order at a time.
+    - Give each team member only one order at a time. Members whose tasks do not depend on each other's results can receive their orders in the same response, one order per line.
     - After receiving feedback from a team member, check the results of the task, and make sure it has been well completed before proceding to th next order.
 
     Reply "TERMINATE" in the end when everything is done.
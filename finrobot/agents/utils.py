@@ -1,7 +1,22 @@
 import re
+import json
+from functools import lru_cache
+from contextvars import ContextVar
+from autogen.agentchat.chat import initiate_chats, a_initiate_chats
 from .prompts import order_template
 
 
+def ends_with_terminate(message):
+    # Termination check reading the message content only once
+    content = message.get("content")
+    return bool(content) and content.endswith("TERMINATE")
+
+
+def contains_terminate(message):
+    content = message.get("content")
+    return bool(content) and "TERMINATE" in content
+
+
 def instruction_trigger(sender):
     # Check if the last message contains the path to the instruction text file
     return "instruction & resources saved to" in sender.last_message()["content"]
@@ -10,7 +25,7 @@ def instruction_trigger(sender):
 def instruction_message(recipient, messages, sender, config):
     # Extract the path to the instruction text file from the last message
     full_order = recipient.chat_messages_for_summary(sender)[-1]["content"]
-    txt_path = full_order.replace("instruction & resources saved to ", "").strip()
+    txt_path = full_order.partition("instruction & resources saved to ")[2].strip()
     with open(txt_path, "r") as f:
         instruction = f.read() + "\n\nReply TERMINATE at the end of your response."
     return instruction
@@ -22,12 +37,128 @@ def order_trigger(sender, name, pattern):
     return sender.name == name and pattern in sender.last_message()["content"]
 
 
+@lru_cache(maxsize=None)
+def _order_pattern(name):
+    # Compiled once per member name, markdown emphasis around the tag is skipped
+    return re.compile(rf"\[{re.escape(name)}\][*:]*\s*(.+?)(?=\n\[|\Z)", re.DOTALL)
+
+
 def order_message(pattern, recipient, messages, sender, config):
     full_order = recipient.chat_messages_for_summary(sender)[-1]["content"]
-    pattern = rf"\[{pattern}\](?::)?\s*(.+?)(?=\n\[|$)"
-    match = re.search(pattern, full_order, re.DOTALL)
+    match = _order_pattern(pattern).search(full_order)
     if match:
         order = match.group(1).strip()
     else:
         order = full_order
     return order_template.format(order=order)
+
+
+def order_tags(names):
+    # Orders to any of the members in one scan, same rule as _order_pattern
+    return re.compile(r"\[(?:" + "|".join(map(re.escape, names)) + r")\]")
+
+
+def orders_trigger(sender, name, tags):
+    # Check if the leader has given an order to any of its members
+    return sender.name == name and bool(tags.search(sender.last_message()["content"]))
+
+
+def member_order_message(pattern, recipient, messages, sender, config):
+    # No message for members without an order, so their nested chats are skipped
+    full_order = recipient.chat_messages_for_summary(sender)[-1]["content"]
+    match = _order_pattern(pattern).search(full_order)
+    if not match:
+        return None
+    return order_template.format(order=match.group(1).strip())
+
+
+# Cache of the running group chat, set once by chat() / achat() and handed to the nested
+# chat of every order. Agents' client_cache can't be used, each chat swaps it in and out.
+order_cache = ContextVar("order_cache", default=None)
+
+
+def _ordered_chats(chat_queue, recipient, messages, sender, config):
+    # Nested chats of the members ordered in the leader's last message
+    chats = []
+    for chat in chat_queue:
+        message = chat["message"](recipient, messages, sender, config)
+        if message is not None:
+            chats.append(dict(chat, message=message))
+    return chats
+
+
+def _report_orders(chats, summaries):
+    if len(chats) == 1:
+        return summaries[0]
+    # Not in the order format, so quoting a result back doesn't order the member again
+    return "\n\n".join(
+        f"Result from {chat['recipient'].name}: {summary}"
+        for chat, summary in zip(chats, summaries)
+    )
+
+
+def summary_from_orders(chat_queue, recipient, messages, sender, config):
+    # Run the nested chats of all ordered members one after another
+    chats = _ordered_chats(chat_queue, recipient, messages, sender, config)
+    if not chats:
+        return True, None
+    for i, chat in enumerate(chats):
+        # Members work on their own orders, earlier summaries aren't carried over (as in achat)
+        chat["finished_chat_indexes_to_exclude_from_carryover"] = list(range(i))
+        chat.setdefault("cache", order_cache.get())
+    results = initiate_chats(chats)
+    return True, _report_orders(chats, [r.summary for r in results])
+
+
+async def a_summary_from_orders(chat_queue, recipient, messages, sender, config):
+    # Run the nested chats of all ordered members concurrently, they share no state
+    chats = _ordered_chats(chat_queue, recipient, messages, sender, config)
+    if not chats:
+        return True, None
+    for chat in chats:
+        chat.setdefault("cache", order_cache.get())
+    results = await a_initiate_chats(chats)
+    return True, _report_orders(chats, [results[c["chat_id"]].summary for c in chats])
+
+
+class NormalizedCache:
+    """
+    LLM response cache that ignores layout-only differences in prompts.
+
+    Wraps an opened autogen cache (e.g. Cache.disk()) and normalizes the message contents
+    of each request key before the lookup, so requests that differ only in trailing spaces,
+    line endings or surrounding blank lines share one cached response.
+    Prompts are otherwise matched exactly, unlike similarity based caches.
+    """
+
+    _trailing_spaces = re.compile(r"[ \t]+$", re.MULTILINE)
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def _normalize(self, key):
+        try:
+            request = json.loads(key)
+        except (TypeError, ValueError):
+            return key
+        for message in request.get("messages") or []:
+            if isinstance(message, dict) and isinstance(message.get("content"), str):
+                content = message["content"].replace("\r\n", "\n")
+                message["content"] = self._trailing_spaces.sub("", content).strip()
+        return json.dumps(request, sort_keys=True)
+
+    def get(self, key, default=None):
+        return self.cache.get(self._normalize(key), default)
+
+    def set(self, key, value):
+        self.cache.set(self._normalize(key), value)
+
+    def close(self):
+        self.cache.close()
+
+    def __enter__(self):
+        self.cache.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self.cache.__exit__(exc_type, exc_value, traceback)
@@ -1,7 +1,7 @@
 from .agent_library import library
 from typing import Any, Callable, Dict, List, Optional, Annotated
 import autogen
-from autogen.cache import Cache
+from autogen.cache import Cache, AbstractCache
 from autogen import (
     ConversableAgent,
     AssistantAgent,
@@ -18,6 +18,16 @@ from ..functional.rag import get_rag_function
 from .utils import *
 from .prompts import leader_system_message, role_system_message
 
+# Disk cache for chats run with use_cache, opened once and shared within the process
+_chat_cache = None
+
+
+def get_chat_cache() -> AbstractCache:
+    global _chat_cache
+    if _chat_cache is None:
+        _chat_cache = Cache.disk()
+    return _chat_cache
+
 
 class FinRobot(AssistantAgent):
 
@@ -59,6 +69,8 @@ class FinRobot(AssistantAgent):
 
     def _preprocess_config(self, config):
 
+        # Work on a copy, library entries and group configs are shared between agents
+        config = dict(config)
         role_prompt, leader_prompt, responsibilities = "", "", ""
 
         if "responsibilities" in config:
@@ -128,8 +140,7 @@ class SingleAssistant(SingleAssistantBase):
         self,
         agent_config: str | Dict[str, Any],
         llm_config: Dict[str, Any] = {},
-        is_termination_msg=lambda x: x.get("content", "")
-        and x.get("content", "").endswith("TERMINATE"),
+        is_termination_msg=ends_with_terminate,
         human_input_mode="NEVER",
         max_consecutive_auto_reply=10,
         code_execution_config={
@@ -149,18 +160,43 @@ class SingleAssistant(SingleAssistantBase):
         )
         self.assistant.register_proxy(self.user_proxy)
 
-    def chat(self, message: str, use_cache=False, **kwargs):
-        with Cache.disk() as cache:
-            self.user_proxy.initiate_chat(
-                self.assistant,
-                message=message,
-                cache=cache if use_cache else None,
-                **kwargs,
-            )
+    def chat(
+        self,
+        message: str,
+        use_cache=False,
+        cache: AbstractCache | None = None,  # opened cache shared across chats
+        **kwargs,
+    ):
+        if cache is None and use_cache:
+            cache = get_chat_cache()
+        self.user_proxy.initiate_chat(
+            self.assistant,
+            message=message,
+            cache=cache,
+            **kwargs,
+        )
 
         print("Current chat finished. Resetting agents ...")
         self.reset()
 
+    async def achat(
+        self,
+        message: str,
+        use_cache=False,
+        cache: AbstractCache | None = None,  # opened cache shared across chats
+        **kwargs,
+    ):
+        if cache is None and use_cache:
+            cache = get_chat_cache()
+        await self.user_proxy.a_initiate_chat(
+            self.assistant,
+            message=message,
+            cache=cache,
+            **kwargs,
+        )
+        print("Current chat finished. Resetting agents ...")
+        self.reset()
+
     def reset(self):
         self.user_proxy.reset()
         self.assistant.reset()
@@ -172,8 +208,7 @@ class SingleAssistantRAG(SingleAssistant):
         self,
         agent_config: str | Dict[str, Any],
         llm_config: Dict[str, Any] = {},
-        is_termination_msg=lambda x: x.get("content", "")
-        and x.get("content", "").endswith("TERMINATE"),
+        is_termination_msg=ends_with_terminate,
         human_input_mode="NEVER",
         max_consecutive_auto_reply=10,
         code_execution_config={
@@ -214,8 +249,7 @@ class SingleAssistantShadow(SingleAssistant):
         self,
         agent_config: str | Dict[str, Any],
         llm_config: Dict[str, Any] = {},
-        is_termination_msg=lambda x: x.get("content", "")
-        and x.get("content", "").endswith("TERMINATE"),
+        is_termination_msg=ends_with_terminate,
         human_input_mode="NEVER",
         max_consecutive_auto_reply=10,
         code_execution_config={
@@ -276,8 +310,7 @@ class MultiAssistantBase(ABC):
         ] = [],  # overwrites previous config
         llm_config: Dict[str, Any] = {},
         user_proxy: UserProxyAgent | None = None,
-        is_termination_msg=lambda x: x.get("content", "")
-        and x.get("content", "").endswith("TERMINATE"),
+        is_termination_msg=ends_with_terminate,
         human_input_mode="NEVER",
         max_consecutive_auto_reply=10,
         code_execution_config={
@@ -335,14 +368,49 @@ class MultiAssistantBase(ABC):
     def _get_representative(self) -> ConversableAgent:
         pass
 
-    def chat(self, message: str, use_cache=False, **kwargs):
-        with Cache.disk() as cache:
+    def chat(
+        self,
+        message: str,
+        use_cache=False,
+        cache: AbstractCache | None = None,  # opened cache shared across chats
+        **kwargs,
+    ):
+        if cache is None and use_cache:
+            cache = get_chat_cache()
+        # the nested chats of orders, at any depth, run with the same cache
+        token = order_cache.set(cache)
+        try:
             self.user_proxy.initiate_chat(
                 self.representative,
                 message=message,
-                cache=cache if use_cache else None,
+                cache=cache,
+                **kwargs,
+            )
+        finally:
+            order_cache.reset(token)
+        print("Current chat finished. Resetting agents ...")
+        self.reset()
+
+    async def achat(
+        self,
+        message: str,
+        use_cache=False,
+        cache: AbstractCache | None = None,  # opened cache shared across chats
+        **kwargs,
+    ):
+        if cache is None and use_cache:
+            cache = get_chat_cache()
+        # the nested chats of orders, at any depth, run with the same cache
+        token = order_cache.set(cache)
+        try:
+            await self.user_proxy.a_initiate_chat(
+                self.representative,
+                message=message,
+                cache=cache,
                 **kwargs,
             )
+        finally:
+            order_cache.reset(token)
         print("Current chat finished. Resetting agents ...")
         self.reset()
 
@@ -409,8 +477,20 @@ class MultiAssistantWithLeader(MultiAssistantBase):
                 "title": "Employee Title",
                 "responsibilities": ["responsibility 1", "responsibility 2"]
             }, ...
-        ]
+        ],
+        "max_turns": 10,  # optional, turns of each leader - member chat
+        "max_consecutive_auto_reply": 3,  # optional, auto replies within each of them
+        "use_async": False  # optional, run the orders of one leader response concurrently
     }
+
+    Groups doing single step tasks (e.g. computing a ratio from given data) can lower
+    max_turns and max_consecutive_auto_reply so a member isn't asked for more LLM turns
+    than the task needs.
+
+    A leader response can order several members, every ordered member is then run (not
+    only the first one) and the leader gets back all of their results. Orders run one
+    after another, or concurrently with "use_async", in which case the group (and any
+    group it is nested in) has to be run with achat().
     """
 
     def _get_representative(self):
@@ -429,41 +509,56 @@ class MultiAssistantWithLeader(MultiAssistantBase):
             == 1
         )
 
-        group_desc = ""
+        # Collect the member descriptions and join them once
+        member_descs = []
         for i, c in enumerate(self.agent_configs):
             if isinstance(c, ConversableAgent):
-                group_desc += c.description + "\n\n"
+                member_descs.append(c.description)
             else:
                 name = c["title"] if "title" in c else c.get("name", "")
                 name = name.replace(" ", "_").strip() + (
                     f"_{i+1}" if need_suffix else ""
                 )
-                responsibilities = (
-                    "\n".join([f" - {r}" for r in c.get("responsibilities", [])]),
+                responsibilities = "\n".join(
+                    [f" - {r}" for r in c.get("responsibilities", [])]
+                )
+                member_descs.append(
+                    f"Name: {name}\nResponsibility:\n{responsibilities}"
                 )
-                group_desc += f"Name: {name}\nResponsibility:\n{responsibilities}\n\n"
 
         self.leader_config = self.group_config["leader"]
-        self.leader_config["group_desc"] = group_desc.strip()
+        self.leader_config["group_desc"] = "\n\n".join(member_descs).strip()
 
         # Initialize Leader
         leader = self._init_single_agent(self.leader_config)
 
-        # Register Leader - Agents connections
-        for agent in self.agents:
-            self.user_proxy.register_nested_chats(
-                [
-                    {
-                        "sender": self.user_proxy,
-                        "recipient": agent,
-                        "message": partial(order_message, agent.name),
-                        "summary_method": "reflection_with_llm",
-                        "max_turns": 10,
-                        "max_consecutive_auto_reply": 3,
-                    }
-                ],
-                trigger=partial(
-                    order_trigger, name=leader.name, pattern=f"[{agent.name}]"
+        # Register Leader - Agents connections, one nested chat per ordered member
+        chat_queue = [
+            {
+                "chat_id": i,
+                "sender": self.user_proxy,
+                "recipient": agent,
+                "message": partial(member_order_message, agent.name),
+                "summary_method": "reflection_with_llm",
+                "max_turns": self.group_config.get("max_turns", 10),
+                "max_consecutive_auto_reply": self.group_config.get(
+                    "max_consecutive_auto_reply", 3
                 ),
-            )
+            }
+            for i, agent in enumerate(self.agents)
+        ]
+        trigger = partial(
+            orders_trigger,
+            name=leader.name,
+            tags=order_tags(agent.name for agent in self.agents),
+        )
+        use_async = self.group_config.get("use_async", False)
+        self.user_proxy.register_nested_chats(
+            chat_queue,
+            trigger=trigger,
+            reply_func_from_nested_chats=(
+                a_summary_from_orders if use_async else summary_from_orders
+            ),
+            use_async=use_async,
+        )
         return leader
@@ -3,31 +3,72 @@ import finnhub
 import pandas as pd
 import json
 import random
+import threading
+import requests
 from typing import Annotated
-from collections import defaultdict
 from functools import wraps
 from datetime import datetime
-from ..utils import decorate_all_methods, save_output, SavePathType
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from ..utils import decorate_all_methods, disk_cache, save_output, SavePathType
+
+finnhub_client = None
+_finnhub_client_lock = threading.Lock()
+
+
+def _create_finnhub_client(api_key):
+    client = finnhub.Client(api_key=api_key)
+    # Share keep-alive connections between concurrent tool calls and back off on rate limits.
+    # finnhub-python has no hook for its HTTP session, this is the only place relying on the
+    # requests session it keeps in Client._session. Without one the client is used as is.
+    session = getattr(client, "_session", None)
+    if isinstance(session, requests.Session):
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]
+            ),
+        )
+        session.mount("https://", adapter)
+    return client
 
 
 def init_finnhub_client(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
         global finnhub_client
-        if os.environ.get("FINNHUB_API_KEY") is None:
+        api_key = os.environ.get("FINNHUB_API_KEY")
+        if api_key is None:
             print(
                 "Please set the environment variable FINNHUB_API_KEY to use the Finnhub API."
             )
             return None
-        else:
-            finnhub_client = finnhub.Client(api_key=os.environ["FINNHUB_API_KEY"])
-            print("Finnhub client initialized")
-            return func(*args, **kwargs)
+        with _finnhub_client_lock:
+            if finnhub_client is None or finnhub_client.api_key != api_key:
+                finnhub_client = _create_finnhub_client(api_key)
+                print("Finnhub client initialized")
+        return func(*args, **kwargs)
 
     # wrapper.__annotations__ = func.__annotations__
     return wrapper
 
 
+@disk_cache(expire=24 * 3600)
+def _fetch_company_profile(symbol):
+    return finnhub_client.company_profile2(symbol=symbol)
+
+
+@disk_cache(expire=10 * 60)
+def _fetch_company_news(symbol, start_date, end_date):
+    return finnhub_client.company_news(symbol, _from=start_date, to=end_date)
+
+
+@disk_cache(expire=24 * 3600)
+def _fetch_basic_financials(symbol):
+    return finnhub_client.company_basic_financials(symbol, "all")
+
+
 @decorate_all_methods(init_finnhub_client)
 class FinnHubUtils:
 
@@ -35,7 +76,7 @@ class FinnHubUtils:
         """
         get a company's profile information
         """
-        profile = finnhub_client.company_profile2(symbol=symbol)
+        profile = _fetch_company_profile(symbol)
         if not profile:
             return f"Failed to find company profile for symbol {symbol} from finnhub!"
 
@@ -69,9 +110,16 @@ class FinnHubUtils:
         """
         retrieve market news related to designated company
         """
-        news = finnhub_client.company_news(symbol, _from=start_date, to=end_date)
+        news = _fetch_company_news(symbol, start_date, end_date)
         if len(news) == 0:
             print(f"No company news found for symbol {symbol} from finnhub!")
+        # Randomly select a subset of news if the number of news exceeds the maximum,
+        # without duplicates and reproducibly for the same query
+        if len(news) > max_news_num:
+            rng = random.Random(f"{symbol}|{start_date}|{end_date}")
+            news = rng.sample(news, k=max_news_num)
+        # sort on the raw timestamps and only format the news that are kept
+        news = sorted(news, key=lambda n: n["datetime"])
         news = [
             {
                 "date": datetime.fromtimestamp(n["datetime"]).strftime("%Y%m%d%H%M%S"),
@@ -80,10 +128,6 @@ class FinnHubUtils:
             }
             for n in news
         ]
-        # Randomly select a subset of news if the number of news exceeds the maximum
-        if len(news) > max_news_num:
-            news = random.choices(news, k=max_news_num)
-        news.sort(key=lambda x: x["date"])
         output = pd.DataFrame(news)
         save_output(output, f"company news of {symbol}", save_path=save_path)
 
@@ -113,19 +157,24 @@ class FinnHubUtils:
         if freq not in ["annual", "quarterly"]:
             return f"Invalid reporting frequency {freq}. Please specify either 'annual' or 'quarterly'."
 
-        basic_financials = finnhub_client.company_basic_financials(symbol, "all")
+        basic_financials = _fetch_basic_financials(symbol)
         if not basic_financials["series"]:
             return f"Failed to find basic financials for symbol {symbol} from finnhub! Try a different symbol."
 
-        output_dict = defaultdict(dict)
-        for metric, value_list in basic_financials["series"][freq].items():
-            if selected_columns and metric not in selected_columns:
-                continue
-            for value in value_list:
-                if value["period"] >= start_date and value["period"] <= end_date:
-                    output_dict[metric].update({value["period"]: value["v"]})
-
-        financials_output = pd.DataFrame(output_dict)
+        # one pass over the series, keeping only the periods in range
+        series = {
+            metric: {
+                value["period"]: value["v"]
+                for value in value_list
+                if start_date <= value["period"] <= end_date
+            }
+            for metric, value_list in basic_financials["series"][freq].items()
+            if not selected_columns or metric in selected_columns
+        }
+        # metrics without a period in range get no column
+        financials_output = pd.DataFrame(
+            {metric: periods for metric, periods in series.items() if periods}
+        )
         financials_output = financials_output.rename_axis(index="date")
         save_output(financials_output, "basic financials", save_path=save_path)
 
@@ -141,18 +190,20 @@ class FinnHubUtils:
         """
         get latest basic financials for a designated company
         """
-        basic_financials = finnhub_client.company_basic_financials(symbol, "all")
+        basic_financials = _fetch_basic_financials(symbol)
         if not basic_financials["series"]:
             return f"Failed to find basic financials for symbol {symbol} from finnhub! Try a different symbol."
 
         output_dict = basic_financials["metric"]
         for metric, value_list in basic_financials["series"]["quarterly"].items():
-            value = value_list[0]
-            output_dict.update({metric: value["v"]})
+            output_dict[metric] = value_list[0]["v"]
 
-        for k in output_dict.keys():
-            if selected_columns and k not in selected_columns:
-                output_dict.pop(k)
+        if selected_columns:
+            # filter in a single pass, popping keys while iterating the dict would fail
+            selected_columns = set(selected_columns)
+            output_dict = {
+                k: v for k, v in output_dict.items() if k in selected_columns
+            }
 
         return json.dumps(output_dict, indent=2)
 
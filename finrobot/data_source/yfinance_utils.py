@@ -3,7 +3,7 @@ from typing import Annotated, Callable, Any, Optional
 from pandas import DataFrame
 from functools import wraps
 
-from ..utils import save_output, SavePathType, decorate_all_methods
+from ..utils import save_output, SavePathType, decorate_all_methods, disk_cache
 
 
 def init_ticker(func: Callable) -> Callable:
@@ -17,6 +17,11 @@ def init_ticker(func: Callable) -> Callable:
     return wrapper
 
 
+@disk_cache(expire=10 * 60)
+def _fetch_history(symbol, start_date, end_date):
+    return yf.Ticker(symbol).history(start=start_date, end=end_date)
+
+
 @decorate_all_methods(init_ticker)
 class YFinanceUtils:
 
@@ -32,7 +37,7 @@ class YFinanceUtils:
     ) -> DataFrame:
         """retrieve stock price data for designated ticker symbol"""
         ticker = symbol
-        stock_data = ticker.history(start=start_date, end=end_date)
+        stock_data = _fetch_history(ticker.ticker, start_date, end_date)
         save_output(stock_data, f"Stock data for {ticker.ticker}", save_path)
         return stock_data
 
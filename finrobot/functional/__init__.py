@@ -1,6 +1,7 @@
 from .analyzer import ReportAnalysisUtils
 from .charting import MplFinanceUtils, ReportChartUtils
 from .coding import CodingUtils, IPythonUtils
+from .market_data import MarketDataUtils
 from .quantitative import BackTraderUtils
 from .reportlab import ReportLabUtils
 from .text import TextUtils
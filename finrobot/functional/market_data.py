@@ -0,0 +1,104 @@
+import yfinance as yf
+from typing import Annotated
+from concurrent.futures import ThreadPoolExecutor
+from pandas import DataFrame, MultiIndex
+
+from ..data_source import FinnHubUtils, YFinanceUtils
+
+
+def _to_text(result) -> str:
+    if result is None:
+        # FinnHubUtils return None when no API key is set
+        return "Not available, the environment variable FINNHUB_API_KEY is not set."
+    if isinstance(result, DataFrame):
+        return result.to_string()
+    return str(result)
+
+
+class MarketDataUtils:
+
+    def gather_company_data(
+        symbol: Annotated[str, "ticker symbol"],
+        start_date: Annotated[
+            str, "start date of the search period for news and stock price, yyyy-mm-dd"
+        ],
+        end_date: Annotated[
+            str, "end date of the search period for news and stock price, yyyy-mm-dd"
+        ],
+    ) -> str:
+        """
+        retrieve company profile, market news, latest basic financials and stock price data
+        of a designated company in one call
+        """
+        # The four requests are independent network round-trips, so fetch them concurrently
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = {
+                "Company Profile": executor.submit(
+                    FinnHubUtils.get_company_profile, symbol
+                ),
+                "Company News": executor.submit(
+                    FinnHubUtils.get_company_news, symbol, start_date, end_date
+                ),
+                "Basic Financials": executor.submit(
+                    FinnHubUtils.get_basic_financials, symbol
+                ),
+                "Stock Price Data": executor.submit(
+                    YFinanceUtils.get_stock_data, symbol, start_date, end_date
+                ),
+            }
+            sections = [
+                f"[{title}]:\n\n{_to_text(future.result())}"
+                for title, future in futures.items()
+            ]
+
+        return "\n\n".join(sections)
+
+    def get_stock_data_batch(
+        symbols: Annotated[list[str], "list of ticker symbols"],
+        start_date: Annotated[
+            str, "start date for retrieving stock price data, YYYY-mm-dd"
+        ],
+        end_date: Annotated[
+            str, "end date for retrieving stock price data, YYYY-mm-dd"
+        ],
+    ) -> str:
+        """
+        retrieve daily close prices of several ticker symbols with a single request
+        """
+        # yfinance reports tickers in upper case, each ticker is requested once
+        symbols = [symbol.strip().upper() for symbol in symbols if symbol.strip()]
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return "No ticker symbols given."
+        stock_data = yf.download(
+            symbols,
+            start=start_date,
+            end=end_date,
+            group_by="ticker",
+            threads=True,
+            progress=False,
+        )
+        if isinstance(stock_data.columns, MultiIndex):
+            frames = {
+                symbol: stock_data[symbol]
+                for symbol in set(stock_data.columns.get_level_values(0))
+            }
+        else:
+            # some yfinance versions return flat columns for a single ticker
+            frames = {symbols[0]: stock_data} if len(symbols) == 1 else {}
+        sections = []
+        for symbol in symbols:
+            # failed tickers come back as all NaN columns
+            frame = frames.get(symbol)
+            close = (
+                frame["Close"].dropna()
+                if frame is not None and "Close" in frame
+                else None
+            )
+            if close is None or close.empty:
+                sections.append(f"[{symbol}]:\n\nFailed to retrieve stock data.")
+                continue
+            # write the close Series straight to csv, no single column DataFrame needed
+            sections.append(f"[{symbol}]:\n\n{close.round(2).to_csv()}")
+
+        return "\n\n".join(sections)
@@ -98,7 +98,14 @@ class BackTraderUtils:
 
         # Create a data feed
         data = bt.feeds.PandasData(
-            dataname=yf.download(ticker_symbol, start_date, end_date, auto_adjust=True)
+            dataname=yf.download(
+                ticker_symbol,
+                start=start_date,
+                end=end_date,
+                auto_adjust=True,
+                progress=False,
+                threads=False,
+            )
         )
         cerebro.adddata(data)  # Add the data feed
         # Set our desired cash start
@@ -1,4 +1,6 @@
-from autogen.agentchat.contrib.retrieve_user_proxy_agent import RetrieveUserProxyAgent
+import asyncio
+import threading
+from functools import lru_cache, wraps
 from typing import Annotated
 
 
@@ -11,7 +13,19 @@ Retrieved context is: {input_context}
 """
 
 
-def get_rag_function(retrieve_config, description=""):
+@lru_cache(maxsize=None)
+def _shared_vector_db(path="tmp/db"):
+    # One persistent chroma client and embedding model per db path, shared by all rag functions
+    from autogen.agentchat.contrib.vectordb.chromadb import ChromaVectorDB
+
+    return ChromaVectorDB(path=path)
+
+
+def get_rag_function(retrieve_config, description="", use_async=False):
+    # Imported here, as it loads chromadb, which agents without retrieval don't need
+    from autogen.agentchat.contrib.retrieve_user_proxy_agent import (
+        RetrieveUserProxyAgent,
+    )
 
     def termination_msg(x):
         return (
@@ -22,6 +36,16 @@ def get_rag_function(retrieve_config, description=""):
     if "customized_prompt" not in retrieve_config:
         retrieve_config["customized_prompt"] = PROMPT_RAG_FUNC
 
+    # Reuse the default vector db instead of loading a new client and embedding model per call
+    if (
+        retrieve_config.get("vector_db", "chroma") == "chroma"
+        and not retrieve_config.get("db_config")
+        and "embedding_function" not in retrieve_config
+    ):
+        vector_db = _shared_vector_db()
+        retrieve_config["vector_db"] = vector_db
+        retrieve_config.setdefault("client", vector_db.client)
+
     rag_assitant = RetrieveUserProxyAgent(
         name="RAG_Assistant",
         is_termination_msg=termination_msg,
@@ -33,6 +57,8 @@ def get_rag_function(retrieve_config, description=""):
         description="Assistant who has extra content retrieval power for solving difficult problems.",
     )
 
+    rag_lock = threading.Lock()
+
     def retrieve_content(
         message: Annotated[
             str,
@@ -42,24 +68,27 @@ def get_rag_function(retrieve_config, description=""):
         n_results: Annotated[int, "Number of results to retrieve, default to 3"] = 3,
     ) -> str:
 
-        rag_assitant.n_results = n_results  # Set the number of results to be retrieved.
-        # Check if we need to update the context.
-        update_context_case1, update_context_case2 = rag_assitant._check_update_context(
-            message
-        )
-        if (
-            update_context_case1 or update_context_case2
-        ) and rag_assitant.update_context:
-            rag_assitant.problem = (
-                message
-                if not hasattr(rag_assitant, "problem")
-                else rag_assitant.problem
+        # The rag assistant keeps the state of the current query, so concurrent calls take turns
+        with rag_lock:
+            # Set the number of results to be retrieved.
+            rag_assitant.n_results = n_results
+            # Check if we need to update the context.
+            update_context_case1, update_context_case2 = (
+                rag_assitant._check_update_context(message)
             )
-            _, ret_msg = rag_assitant._generate_retrieve_user_reply(message)
-        else:
-            _context = {"problem": message, "n_results": n_results}
-            ret_msg = rag_assitant.message_generator(rag_assitant, None, _context)
-        return ret_msg if ret_msg else message
+            if (
+                update_context_case1 or update_context_case2
+            ) and rag_assitant.update_context:
+                rag_assitant.problem = (
+                    message
+                    if not hasattr(rag_assitant, "problem")
+                    else rag_assitant.problem
+                )
+                _, ret_msg = rag_assitant._generate_retrieve_user_reply(message)
+            else:
+                _context = {"problem": message, "n_results": n_results}
+                ret_msg = rag_assitant.message_generator(rag_assitant, None, _context)
+            return ret_msg if ret_msg else message
 
     if description:
         retrieve_content.__doc__ = description
@@ -70,4 +99,12 @@ def get_rag_function(retrieve_config, description=""):
             docs_str = "\n".join(docs if isinstance(docs, list) else [docs])
             retrieve_content.__doc__ += f"Availale Documents:\n{docs_str}"
 
+    if use_async:
+        sync_retrieve_content = retrieve_content
+
+        @wraps(sync_retrieve_content)
+        async def retrieve_content(*args, **kwargs):
+            # Retrieve in a worker thread, so concurrent chats keep going in the meantime
+            return await asyncio.to_thread(sync_retrieve_content, *args, **kwargs)
+
     return retrieve_content, rag_assitant  # for debug use
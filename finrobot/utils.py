@@ -1,7 +1,11 @@
 import os
 import json
+import time
+import threading
+import diskcache
 import pandas as pd
 from datetime import date, timedelta, datetime
+from functools import lru_cache, wraps
 from typing import Annotated
 
 
@@ -24,10 +28,59 @@ def save_output(data: pd.DataFrame, tag: str, save_path: SavePathType = None) ->
         print(f"{tag} saved to {save_path}")
 
 
-def get_current_date():
+# Directory of the on-disk cache for data source responses.
+# Set FINROBOT_DATA_CACHE=off (or DATA_CACHE_DIR to None) to always fetch fresh data.
+DATA_CACHE_DIR = os.environ.get("FINROBOT_DATA_CACHE", ".cache/data_source")
+_data_cache = None
+_data_cache_lock = threading.Lock()
+
+
+def _is_empty(result) -> bool:
+    return result is None or (hasattr(result, "__len__") and len(result) == 0)
+
+
+def disk_cache(expire: int | None = None):
+    """
+    Memoize a data fetching function on disk, keyed on its arguments.
+    Empty results (None, empty containers / DataFrames) are never cached.
+    Disabled when DATA_CACHE_DIR is None, empty or "off".
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            global _data_cache
+            if DATA_CACHE_DIR in (None, "", "off"):
+                return func(*args, **kwargs)
+            if _data_cache is None:
+                # cached fetchers are called from several threads at once
+                with _data_cache_lock:
+                    if _data_cache is None:
+                        _data_cache = diskcache.Cache(DATA_CACHE_DIR)
+            key = (func.__module__, func.__name__, args, tuple(sorted(kwargs.items())))
+            result = _data_cache.get(key)
+            if result is not None:
+                return result
+            result = func(*args, **kwargs)
+            if not _is_empty(result):
+                _data_cache.set(key, result, expire=expire)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+@lru_cache(maxsize=1)
+def _current_date_for(minute: int) -> str:
     return date.today().strftime("%Y-%m-%d")
 
 
+def get_current_date():
+    # formatted at most once a minute, the date stays right across midnight
+    return _current_date_for(int(time.time() // 60))
+
+
 def register_keys_from_json(file_path):
     with open(file_path, "r") as f:
         keys = json.load(f)
@@ -35,6 +88,20 @@ def register_keys_from_json(file_path):
         os.environ[key] = value
 
 
+@lru_cache(maxsize=8)
+def _load_config_list(file_path, models):
+    from autogen import config_list_from_json
+
+    return tuple(config_list_from_json(file_path, filter_dict={"model": list(models)}))
+
+
+def get_config_list(file_path, models: list[str]):
+    """
+    Read and filter an OAI config list once per process, returns fresh copies of the configs
+    """
+    return [dict(c) for c in _load_config_list(file_path, tuple(models))]
+
+
 def decorate_all_methods(decorator):
     def class_decorator(cls):
         for attr_name, attr_value in cls.__dict__.items():